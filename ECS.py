@@ -18,10 +18,11 @@ class Position (Vector2d): pass
 class Velocity (Vector2d): pass
 #creates component type [Position] and [Velocity] from existing component [Vector2d]
 
-def MovementSystem(positionComponents : list[Position], velocityComponents : list[Velocity]):
-    for pos,velo in zip(positionComponents, velocityComponents):
-        pos.x += velo.x 
-        pos.y += velo.y
+def MovementSystem(positions : list[Position], velocities : list[Velocity]):
+    positions['x'] += velocities['x']
+    positions['y'] += velocities['y']
+    #each component type with __fields__ is handed to the system as named numpy columns,
+    #so one line updates every entity at once
 
 TestGame = Game()
 TestGame.AddSystem(MovementSystem)
@@ -41,15 +42,15 @@ class Position (Vector2d): pass
 class Velocity (Vector2d): pass
 
 @TestGame.ThreadedSystem(CallRate=60) #System which is called 60 times per second
-def MovementSystem(positionComponents : list[Position], velocityComponents : list[Velocity]):
-    for pos,velo in zip(positionComponents, velocityComponents):
-        pos.x += velo.x 
-        pos.y += velo.y
+def MovementSystem(positions : list[Position], velocities : list[Velocity]):
+    positions['x'] += velocities['x']
+    positions['y'] += velocities['y']
 
 @TestGame.MainThreadSystem
-def RenderSystem(positionComponents : list[Position], renderableComponents : list[Renderable]):
-    for pos,renderable in zip(positionComponents, renderableComponents):
-        TestGame.screen.blit(renderable.sprite, pos.ToTuple())
+def RenderSystem(positions : list[Position], renderableComponents : list[Renderable]):
+    TestGame.BatchBlit([(renderable.sprite, (x,y)) for renderable,x,y in zip(renderableComponents, positions['x'].tolist(), positions['y'].tolist())])
+    #one C-level call for the whole batch instead of one screen.blit per entity
+    #(.tolist() converts the columns to plain python floats in one go, which blit positions require)
 
 TestGame.AddEntity()                           \\                
         .AddComponent(Position(x=50,y=50))     \\        
@@ -64,37 +65,73 @@ TestGame.Run()
 ##############imports##############
 from __future__ import annotations
 import pygame
-from functools import lru_cache
-from threading import Thread
+import numpy as np
+try:
+    import numba
+except ImportError:
+    numba = None
+from threading import Thread, Lock
+from concurrent.futures import ThreadPoolExecutor
+import itertools
+import os
 import time
 pygame.init()
 ###################################
 
 #######Entity and Components#######
+__COMPONENT_BITS__ : dict[type,int] = {} #every component class seen so far gets one bit, so a component set packs into a single int
+
+def __component_bit__(class_type : type) -> int:
+    """Returns (registering on first sight) the bit assigned to a component class"""
+    bit = __COMPONENT_BITS__.get(class_type)
+    if bit is None:
+        bit = 1 << len(__COMPONENT_BITS__)
+        __COMPONENT_BITS__[class_type] = bit
+    return bit
+
+def __mask_to_signature__(mask : int) -> frozenset:
+    """Decodes a component bitmask back into the set of component classes, only needed when a brand new archetype is built"""
+    return frozenset(class_type for class_type,bit in __COMPONENT_BITS__.items() if mask & bit)
+
+__ENTITY_IDS__ = itertools.count() #C-level counter, cheaper than class-attribute bookkeeping and atomic under threads
+__CHANGE_TICKS__ = itertools.count(1) #global change clock, bumped whenever any archetype's data is written
+__STRUCTURE_LOCK__ = Lock() #serializes archetype row moves against off-thread system ticks, see FlushDirty
+
 class Entity:
-    __ID_COUNT__ = 0
     """
-A container which holds an id and a list of components </br>
+A container which holds an id and a bitmask of which component types it has </br>
+The component data itself lives in the entity's current <a href="#Archetype">Archetype</a>'s columns </br>
+Component adds/removes are staged and applied in one archetype transition at the next flush, so builder chains pay one sort instead of one per component </br>
 A combination of components should allow for creation of any object from traditional game systems
 """
-    def __init__(self, AddComponentEvent = lambda x : (), RemoveComponentEvent = lambda x : ()) -> None:
-        self.components : dict = {}
-        self.AddComponentEvent = AddComponentEvent
-        self.RemoveComponentEvent = RemoveComponentEvent
-        self.id = Entity.__ID_COUNT__
-        Entity.__ID_COUNT__ += 1
+    def __init__(self, ChangeEvent = lambda x : (), id : int = None) -> None:
+        self.mask : int = 0 #one bit per component type this entity has
+        self._archetype : Archetype = None #which archetype currently stores this entity's component data
+        self._pending : list = [] #staged ops : component objects to add, component classes to remove
+        self._dirty = False #already queued for the next flush
+        self.ChangeEvent = ChangeEvent
+        self.id = next(__ENTITY_IDS__) if id is None else id #managed entities get a generational id from the SystemManager instead
 
     def AddComponent(self, component) -> Entity:
-        self.components[component.__class__] = component
-        self.AddComponentEvent(self)
+        self.mask |= __component_bit__(component.__class__)
+        self._pending.append(component)
+        self.ChangeEvent(self)
         return self
     def RemoveComponent(self, component_class) -> Entity:
-        self.components.pop(component_class)
-        self.RemoveComponentEvent(self)
+        self.mask &= ~__component_bit__(component_class)
+        self._pending.append(component_class)
+        self.ChangeEvent(self)
         return self
 
 class Vector2d:
-    """Simple Vector component"""
+    """
+Simple Vector component </br>
+Declares **__fields__** so its data is stored in contiguous numpy columns rather than as heap objects </br>
+float32 on purpose : 8 bytes per entity means a whole cache line holds 8 of them, and games don't need f8 positional accuracy within a frame </br>
+Declares **__slots__** so instances carry no per-object dict - subclasses should add `__slots__ = ()` to keep that benefit
+"""
+    __fields__ = (('x','f4'),('y','f4'))
+    __slots__ = ('x','y')
     def __init__(self,x,y) -> None:
         self.x = x
         self.y = y
@@ -109,103 +146,354 @@ Component which stores a sprite for the entity. </br>
 - **Dependencies**: [ <a href="#Vector2d">Vector2d</a> ]
 """
     __dependencies__ = []
+    __slots__ = ('path',)
     def __init__(self, sprite : str) -> None:
-        self.sprite = LoadImage(sprite)
+        self.path = sprite
+        LoadImage(sprite) #warm the cache now, disk I/O doesn't belong in a frame
+
+    @property
+    def sprite(self):
+        """The pygame surface, resolved through the image cache so it is always the display-converted copy (even for components created before <a>Game.Run</a>)"""
+        return LoadImage(self.path)
 ###################################
 
 
 #############Systems###############
+class Archetype:
+    """
+**Not to be created directly**</br>
+- Owns the component columns for every entity that has exactly this set of component types </br>
+- Systems iterate archetype by archetype, so adding/removing a component is a single move between two archetypes instead of a re-sort through every system
+"""
+    def __init__(self, signature : frozenset) -> None:
+        self.signature = signature
+        self.mask : int = 0
+        for class_type in signature: self.mask |= __component_bit__(class_type)
+        self.columns : dict = {class_type : self.__make_columns__(class_type) for class_type in signature}
+        self.entities : list[int] = [] #row -> entity id
+        self.rows : dict[int,int] = {} #entity id -> row
+        self.edges_add : dict[type, Archetype] = {} #which archetype adding a given component type leads to
+        self.edges_remove : dict[type, Archetype] = {}
+        self.changed_tick : int = 0 #last tick anything here was written, lets reactive systems early-out in one compare
+        self.column_ticks : dict[type,int] = {class_type : 0 for class_type in signature}
+
+    def __bump__(self, class_types = None) -> None:
+        """Records a write to the given component types (or all of them) on the global change clock"""
+        tick = next(__CHANGE_TICKS__)
+        self.changed_tick = tick
+        for class_type in (self.columns if class_types is None else class_types):
+            self.column_ticks[class_type] = tick
+
+    @staticmethod
+    def __make_columns__(class_type):
+        """Allocates storage for one component type : a structured numpy record array if the type declares **__fields__**, otherwise a plain list"""
+        fields = getattr(class_type, '__fields__', None)
+        if fields is None: return []
+        return np.empty(0, np.dtype(list(fields))) #one record per entity, so a row's fields share a cache line
+
+    def __insert_row__(self, entity : Entity, data : dict, staged : dict = None) -> Archetype:
+        """Appends a row for the entity, taking values from **data** (extracted from its previous archetype) or from the **staged** component objects"""
+        if staged is None: staged = {}
+        count = len(self.entities)
+        for class_type, columns in self.columns.items():
+            component = staged.get(class_type)
+            if isinstance(columns, np.ndarray):
+                values = data.get(class_type) if component is None else tuple(getattr(component, field) for field in columns.dtype.names)
+                column = np.resize(columns, count+1)
+                column[count] = values
+                self.columns[class_type] = column
+            else:
+                columns.append(data.get(class_type) if component is None else component)
+        self.rows[entity.id] = count
+        self.entities.append(entity.id)
+        self.__bump__()
+        return self
+
+    def __extract_row__(self, entity_id : int) -> dict:
+        """Swap-removes the entity's row and returns its component data keyed by type, ready to insert into another archetype"""
+        row = self.rows.pop(entity_id)
+        last = len(self.entities)-1
+        data = {}
+        for class_type, columns in self.columns.items():
+            if isinstance(columns, np.ndarray):
+                data[class_type] = columns[row].copy() #one record holding every field
+                columns[row] = columns[last]
+                self.columns[class_type] = np.resize(columns, last)
+            else:
+                data[class_type] = columns[row]
+                columns[row] = columns[last]
+                columns.pop()
+        moved = self.entities.pop()
+        if row != last: #the swapped-in entity now lives at the freed row
+            self.entities[row] = moved
+            self.rows[moved] = row
+        self.__bump__()
+        return data
+
+    def __update_row__(self, entity : Entity, component) -> Archetype:
+        """Rewrites one component's values in place, used when a component of an already-present type is replaced"""
+        row = self.rows[entity.id]
+        columns = self.columns[component.__class__]
+        if isinstance(columns, np.ndarray):
+            columns[row] = tuple(getattr(component, field) for field in columns.dtype.names)
+        else:
+            columns[row] = component
+        self.__bump__((component.__class__,))
+        return self
+
+def ecs_numeric(*component_types):
+    """
+Marks a system as purely numeric so it can be JIT compiled with numba </br>
+- The queried component types are passed to the decorator instead of through annotations </br>
+- The function receives one flat numpy array per **(type, field)** pair, in declaration order :
+```py
+@ecs_numeric(Position, Velocity)
+def MovementSystem(pos_x, pos_y, velo_x, velo_y):
+    pos_x += velo_x
+    pos_y += velo_y
+```
+- If numba is not installed the system still runs, just interpreted </br>
+- Above <a>System.PARALLEL_CUTOFF</a> entities the loop is dispatched to a **parallel=True** build, so writing it with `numba.prange` spreads it across every core
+"""
+    def decorator(function):
+        function.__ecs_query__ = list(component_types)
+        function.__ecs_numeric__ = True
+        return function
+    return decorator
+
+def reads(*component_types):
+    """
+Declares that a system only **reads** the given component types </br>
+- Systems on the same thread whose read/write sets don't clash are ticked concurrently on a shared thread pool </br>
+- Undeclared queried types are assumed to be written (the safe default)
+"""
+    def decorator(function):
+        function.__ecs_reads__ = frozenset(component_types)
+        return function
+    return decorator
+
+def writes(*component_types):
+    """Declares exactly which component types a system **writes**, everything else it queries is treated as read-only (see <a>reads</a>)"""
+    def decorator(function):
+        function.__ecs_writes__ = frozenset(component_types)
+        return function
+    return decorator
+
 class System:
     """
 **Not to be created directly**</br>
 - Contains a single function and the corresponding components which will be fed into the system every call  </br>
 - A system is a function which is ran every frame unless it is on another thread </br>
 - The parameter's types will define what components it will be given access to </br>
-- This is better understood through an example : 
+- This is better understood through an example :
 ```py
-def MovementSystem(positionComponents : list[Position], velocityComponents : list[Velocity]):
-    # positionComponents and velocityComponents are lists of the specified component types
-    for pos,velo in zip(positionComponents, velocityComponents):
-        # zip() turns ( (pos1, pos2), (velo1, velo2) ) into ((pos1, velo1), (pos2, velo2), ....)
-        # allowing you to iterate through them entity by entity
-        pos.x += velo.x 
-        pos.y += velo.y
-        # adds velocity to the current position
+def MovementSystem(positions : list[Position], velocities : list[Velocity]):
+    # component types which declare __fields__ arrive as structured numpy record
+    # arrays - indexing by field name gives a contiguous view, aligned entity by entity
+    positions['x'] += velocities['x']
+    positions['y'] += velocities['y']
+    # adds velocity to every position in a single vectorized call
 ```
+- Component types without **__fields__** (such as <a href="#Renderable">Renderable</a>) are still passed as plain lists of objects
     """
+    PARALLEL_CUTOFF = 4096 #below this entity count the parallel runtime's launch overhead outweighs the speedup
+
     def __init__(self, SystemFunction, query : list) -> None:
         self.__func__ = SystemFunction
+        if getattr(SystemFunction, '__ecs_query__', None) is not None:
+            query = SystemFunction.__ecs_query__
         self.__query__ : list = self._extract_queries_(query)
-
-        self.Components : list[list] = [[] for _ in range(len(self.__query__))]
-        self.entities : list[int] = []
-        """ List which stores relevant Components in list form: </br> **[type1 = [component1, component2, ...], type2 = [component1, component2, ...], ...]**"""
-
-    def __add_components_from_entity__(self, entity : Entity) -> System:
+        self.__query_set__ : frozenset = frozenset(self.__query__)
+        self.__query_mask__ : int = 0 #compatibility checks collapse to a single AND against this
+        for class_type in self.__query__: self.__query_mask__ |= __component_bit__(class_type)
+
+        self.__numeric__ = getattr(SystemFunction, '__ecs_numeric__', False) \
+                           and all(getattr(class_type, '__fields__', None) for class_type in self.__query__)
+        self.__compiled__ = None
+        self.__compiled_parallel__ = None #multi-core variant, only worth dispatching to above PARALLEL_CUTOFF entities
+        if self.__numeric__ and numba is not None: #compile the hot loop down to machine code, dispatch caches on the System
+            try:
+                self.__compiled__ = numba.njit(cache=True, fastmath=True, boundscheck=False)(SystemFunction)
+                self.__compiled_parallel__ = numba.njit(cache=True, parallel=True, fastmath=True, boundscheck=False)(SystemFunction)
+            except RuntimeError: #functions defined in a REPL have no source file to cache against
+                self.__compiled__ = numba.njit(fastmath=True, boundscheck=False)(SystemFunction)
+                self.__compiled_parallel__ = numba.njit(parallel=True, fastmath=True, boundscheck=False)(SystemFunction)
+
+        self.__matching__ : list[Archetype] = [] #archetypes whose signature satisfies the query, kept current by the SystemManager
+        self.__dispatch__ = self.__build_dispatch__() #trampoline compiled for this exact query, see below
+        self.__reactive__ = getattr(SystemFunction, '__ecs_reactive__', False)
+        self.__last_seen__ : dict[Archetype,int] = {} #per archetype, the change tick this system last ran against
+
+        declared_writes = getattr(SystemFunction, '__ecs_writes__', None)
+        declared_reads = getattr(SystemFunction, '__ecs_reads__', None)
+        if declared_writes is not None:
+            self.__writes__ = frozenset(declared_writes)
+        elif declared_reads is not None:
+            self.__writes__ = self.__query_set__ - declared_reads
+        else: #no declaration, assume every queried type is written
+            self.__writes__ = self.__query_set__
+
+    def __conflicts_with__(self, other : System) -> bool:
+        """True if the two systems can't safely run at the same time (one writes what the other touches)"""
+        return bool(self.__writes__ & other.__query_set__) or bool(other.__writes__ & self.__query_set__)
+
+    def __build_dispatch__(self):
+        """
+        exec-compiles a trampoline specialized to this system's exact query : **target(columns[T0]['x'], columns[T0]['y'], columns[T1], ...)** </br>
+        - Replaces per-call argument list building (and field flattening for numeric systems) with one fixed-arity call
+        """
+        namespace = {}
+        args = []
         for idx,class_type in enumerate(self.__query__):
-            self.Components[idx].append(entity.components[class_type])
-        self.entities.append(entity.id)
-        return self
-
-    def __remove_entity__(self, entity_id : int) -> System:
-        index = self.entities.index(entity_id)
-        for class_list in self.Components:
-            class_list.pop(index)
-        self.entities.remove(entity_id)
-        return self
+            namespace[f'q{idx}'] = class_type
+            if self.__numeric__: #numeric systems take every field as its own flat array argument
+                args += [f"columns[q{idx}][{field!r}]" for field,_ in class_type.__fields__]
+            else:
+                args.append(f"columns[q{idx}]")
+        exec(f"def __dispatch__(target, columns): target({', '.join(args)})", namespace)
+        return namespace['__dispatch__']
+
+    def __run__(self) -> None:
+        """Calls the system once per matching non-empty archetype, handing it that archetype's columns through the compiled trampoline"""
+        dispatch = self.__dispatch__ #bound once, every attribute read inside the loop is a dict probe
+        numeric = self.__numeric__
+        serial = (self.__compiled__ or self.__func__) if numeric else self.__func__
+        parallel = self.__compiled_parallel__
+        cutoff = System.PARALLEL_CUTOFF
+        reactive = self.__reactive__
+        last_seen = self.__last_seen__
+        writes = self.__writes__
+        for archetype in self.__matching__:
+            count = len(archetype.entities)
+            if not count: continue
+            if reactive:
+                seen = last_seen.get(archetype, -1)
+                if archetype.changed_tick <= seen: continue #nothing in this archetype moved since last time, skip in one compare
+                if max(archetype.column_ticks[class_type] for class_type in self.__query__) <= seen:
+                    last_seen[archetype] = archetype.changed_tick #something changed, but not columns this system reads
+                    continue
+            target = parallel if (numeric and parallel is not None and count >= cutoff) else serial
+            dispatch(target, archetype.columns)
+            if writes: archetype.__bump__(writes) #let other (reactive) systems see this system's writes
+            if reactive: last_seen[archetype] = archetype.changed_tick
+
+    def __matches__(self, mask : int) -> bool:
+        return (mask & self.__query_mask__) == self.__query_mask__
 
     def IsEntityCompatible(self, entity : Entity) -> bool:
         """Checks the components an entity has, and returns true if it has all the component types from a query, otherwise returns false"""
-        return all([x in entity.components for x in self.__query__])
+        return self.__matches__(entity.mask)
 
     def _extract_queries_(self, query_types) -> list:
         try:
             result = []
             for query_type in query_types:
-                if query_type.__origin__ == list:
-                    query = query_type.__args__[0]
-                    if query in result: raise ValueError
-                    result.append(query)
-            return list(result)
+                query = query_type.__args__[0] if getattr(query_type, '__origin__', None) == list else query_type
+                if query in result: raise ValueError
+                result.append(query)
+            return result
         except ValueError:
             print("Attempted to add query twice!")
-        
+
+
+    def __precompile__(self) -> System:
+        """Forces numba to compile the system up front (with throwaway columns) so the first real frame doesn't pay the compile cost"""
+        if self.__compiled__ is not None:
+            strided = [] #field views off real record arrays, the strided ('A') layout the dispatch passes for columns of 2+ entities
+            contiguous = [] #single-entity columns yield contiguous ('C') views, which numba specializes separately
+            for class_type in self.__query__:
+                record = np.zeros(2, np.dtype(list(class_type.__fields__))) #length 2 : shorter views still type as contiguous
+                strided += [record[field] for field,_ in class_type.__fields__]
+                contiguous += [np.zeros(1, dtype) for _,dtype in class_type.__fields__]
+            self.__compiled__(*strided)
+            self.__compiled__(*contiguous)
+            if self.__compiled_parallel__ is not None:
+                try:
+                    self.__compiled_parallel__(*strided)
+                    self.__compiled_parallel__(*contiguous)
+                except Exception: #not every loop shape parallelizes, fall back to the serial variant only
+                    self.__compiled_parallel__ = None
+        return self
 
     def __call__(self, *args, **kwargs):
-        self.__func__(*args,**kwargs)
+        if self.__numeric__: #numeric systems take the columns as flat positional arrays
+            flat = [columns[field] for columns in args for field in columns.dtype.names]
+            target = self.__compiled__ or self.__func__
+            if self.__compiled_parallel__ is not None and flat and flat[0].shape[0] >= System.PARALLEL_CUTOFF:
+                target = self.__compiled_parallel__
+            target(*flat)
+        else:
+            self.__func__(*args,**kwargs)
 
 class SystemThread:
     """
 **Not to be created directly**</br>
 - Contains a list of systems which are to be ran off the main system and onto another thread </br>
+- Systems whose read/write sets don't conflict are grouped into wavefronts and ticked in parallel on a shared thread pool </br>
 - Calling a SystemThread object as if it were a function will start up the thread
 """
+    __executor__ : ThreadPoolExecutor = None #shared by every SystemThread, sized to the machine
+
     def __init__(self, rate=144) -> None:
         self.__systems__ : list[System] = []
+        self.__wavefronts__ : list[list[System]] = []
         self.__call_rate__ = rate
         self.__call_interval__ = (1/rate)
         self.__stop__ = True
 
+    @classmethod
+    def __get_executor__(cls) -> ThreadPoolExecutor:
+        if cls.__executor__ is None:
+            cls.__executor__ = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix='ECS-systems')
+        return cls.__executor__
+
+    def __build_wavefronts__(self) -> None:
+        """Greedily groups the systems into waves of mutually non-conflicting systems, each wave can tick concurrently"""
+        waves : list[list[System]] = []
+        for system in self.__systems__:
+            for wave in waves:
+                if not any(system.__conflicts_with__(other) for other in wave):
+                    wave.append(system)
+                    break
+            else:
+                waves.append([system])
+        self.__wavefronts__ = waves
+
     def __thread__(self):
         self.__stop__ = False
-        while True:
-            for system in self.__systems__:
-                system(*system.Components)
-            if self.__stop__: return
-            time.sleep(self.__call_interval__)
-            
+        interval = self.__call_interval__ #hoist every name the loop touches into locals, attribute reads at 144Hz add up
+        monotonic = time.monotonic
+        sleep = time.sleep
+        run = System.__run__
+        structure_lock = __STRUCTURE_LOCK__
+        next_tick = monotonic() #schedule against absolute deadlines so work time isn't added on top of the sleep
+        while not self.__stop__:
+            with structure_lock: #keep FlushDirty from resizing columns mid-iteration, see SystemManager.FlushDirty
+                for wave in self.__wavefronts__: #re-read so systems added while running are picked up
+                    if len(wave) == 1:
+                        run(wave[0])
+                    else: #numba-compiled systems release the GIL inside the jitted region, so these genuinely overlap
+                        list(SystemThread.__get_executor__().map(run, wave))
+            next_tick += interval
+            delay = next_tick - monotonic()
+            if delay > 0:
+                sleep(delay)
+            else: #the systems overran the interval, restart the schedule from now instead of bursting to catch up
+                next_tick = monotonic()
+
     def __call__(self):
         thread = Thread(target=self.__thread__, daemon=True)
         thread.start()
 
     def Stop(self) -> None:
         """stops thread if it is running"""
-        if self.__stop__ == False: self.__stop__ == True
+        if self.__stop__ == False: self.__stop__ = True
 
 
     def AddSystem(self, function) -> SystemThread:
         """Adds a system onto this thread. must pass in a **function** and not a <a href= "#System">System</a> object"""
-        self.__systems__.append(System(function,function.__annotations__.values()))
+        self.__systems__.append(System(function,[annotation for name,annotation in function.__annotations__.items() if name != 'return']))
+        self.__build_wavefronts__()
         return self
 
 
@@ -217,17 +505,54 @@ class SystemManager:
     def __init__(self) -> None:
         self.__main_thread_systems__ : list[System] = []
         self.__off_thread_systems__ : list[SystemThread] = []
-        self.__entities__ : dict[int, Entity] = {}
+        self.__entities__ : list[Entity] = [] #indexed by slot, O(1) lookup without hashing
+        self._free_slots : list[int] = [] #slots whose entity was removed, reused before the list grows
+        self._generations : list[int] = [] #bumped when a slot is freed so stale ids can't alias the new occupant
+        self._dirty : list[Entity] = [] #entities with staged component changes, applied by FlushDirty
+        self._archetypes : dict[int, Archetype] = {} #keyed by component bitmask
+        self._empty_archetype = self.__get_archetype__(0) #where freshly created entities start out
+
+    def __get_archetype__(self, mask : int) -> Archetype:
+        """Returns the archetype for a component bitmask, creating it (and matching it against every system) on first sight"""
+        archetype = self._archetypes.get(mask)
+        if archetype is None:
+            archetype = Archetype(__mask_to_signature__(mask))
+            self._archetypes[mask] = archetype
+            for system in self.__all_systems__():
+                if system.__matches__(mask):
+                    system.__matching__.append(archetype)
+        return archetype
+
+    def __all_systems__(self):
+        yield from self.__main_thread_systems__
+        for thread in self.__off_thread_systems__:
+            yield from thread.__systems__
+
+    def __match_archetypes__(self, system : System) -> System:
+        """Finds every existing archetype a freshly added system should iterate over"""
+        system.__matching__ = [archetype for mask,archetype in self._archetypes.items() if system.__matches__(mask)]
+        return system
 
     def MainThreadSystem(self, function):
         """Decorator which is equivalent to <a>SystemManager.AddSystem</a>"""
         self.AddSystem(function)
 
+    def Reactive(self, function):
+        """
+        Decorator marking a system to be skipped while nothing it queries has changed </br>
+        - Archetypes whose change tick hasn't moved since the system last ran cost a single integer compare instead of a full iteration </br>
+        - Best for systems over mostly-static data (menus, background entities); without it a system runs every frame as usual
+        """
+        function.__ecs_reactive__ = True
+        return function
+
     def AddSystem(self, function) -> SystemManager:
-        """Adds a system onto the main thread. must pass in a **function** and not a <a href= "#System">System</a> object"""
-        new_system = System(function,function.__annotations__.values())
-        for entity in self.__entities__.values():
-            self.SortIntoSystem(entity, new_system)
+        """
+        Adds a system onto the main thread. must pass in a **function** and not a <a href= "#System">System</a> object </br>
+        - Cheap to call even mid-game : matching walks the archetype index (one entry per distinct component set), never the entities themselves
+        """
+        new_system = System(function,[annotation for name,annotation in function.__annotations__.items() if name != 'return']) #a '-> None' return annotation is not a query
+        self.__match_archetypes__(new_system)
         self.__main_thread_systems__.append(new_system)
         return self
 
@@ -249,10 +574,12 @@ class SystemManager:
         for system_thread in self.__off_thread_systems__: #attempt to find a thread which has the same call rate
             if system_thread.__call_rate__ == CallRate:
                 system_thread.AddSystem(function) #if found, add the system to this existing thread
+                self.__match_archetypes__(system_thread.__systems__[-1])
                 return self
 
         new_thread = SystemThread(rate=CallRate) #otherwise, make a new system thread with the specified call rate
         new_thread.AddSystem(function) #add the system to this new system thread
+        self.__match_archetypes__(new_thread.__systems__[-1])
         self.__add_system_thread_(new_thread) #add this system thread to the Game
 
     def __add_system_thread_(self, system_thread : SystemThread, StartThread=True) -> SystemManager:
@@ -260,34 +587,96 @@ class SystemManager:
         if StartThread: system_thread() #starts thread
         return self
 
-    def __tick_systems__(self) -> SystemManager:
-        """Will call all the systems on the main thread"""
+    def __precompile_systems__(self) -> SystemManager:
+        """Ahead-of-time compiles every numba-backed system (see <a>System.__precompile__</a>)"""
         for system in self.__main_thread_systems__:
-            system(*system.Components)
+            system.__precompile__()
+        for thread in self.__off_thread_systems__:
+            for system in thread.__systems__:
+                system.__precompile__()
         return self
 
-    def SortEntity(self, entity : Entity) -> None:
-        """iterates through all systems and checks if entity fits the system's query"""
+    def __tick_systems__(self) -> SystemManager:
+        """Will call all the systems on the main thread (after applying any staged component changes)"""
+        if self._dirty: self.FlushDirty()
         for system in self.__main_thread_systems__:
-            self.SortIntoSystem(entity, system)
-        for thread in self.__off_thread_systems__:
-            for system in thread.__systems__:
-                self.SortIntoSystem(entity, system)
+            system.__run__()
+        return self
 
-    def SortIntoSystem(self, entity : Entity, system : System):
-        """Attempts to insert entity's compatible components into the system if they match the query or remove components if player no longer fits the query"""
-        if system.IsEntityCompatible(entity):
-            if not (entity.id in system.entities):
-                system.__add_components_from_entity__(entity)
-        else :
-            if entity.id in system.entities:
-                system.__remove_entity__(entity.id)
+    def __mark_dirty__(self, entity : Entity) -> None:
+        if not entity._dirty:
+            entity._dirty = True
+            self._dirty.append(entity)
 
+    def FlushDirty(self) -> SystemManager:
+        """
+        Applies every staged component add/remove, one archetype transition per dirty entity </br>
+        - Called automatically at the start of each frame, so building an entity with K components costs one sort instead of K </br>
+        - Row moves resize columns that off-thread systems may be iterating, so the whole pass holds the structure lock shared with <a>SystemThread</a> ticks
+        """
+        dirty = self._dirty
+        self._dirty = []
+        with __STRUCTURE_LOCK__:
+            for entity in dirty:
+                entity._dirty = False
+                pending = entity._pending
+                entity._pending = []
+                old_archetype = entity._archetype
+                if old_archetype is None: continue #removed before the flush
+                if entity.mask == old_archetype.mask: #no structural change, rewrite the rows in place
+                    for component in pending:
+                        #skip removal markers, and adds whose type was removed again within the same frame (it has no column here)
+                        if not isinstance(component, type) and component.__class__ in old_archetype.columns:
+                            old_archetype.__update_row__(entity, component)
+                    continue
+                if len(pending) == 1: #single add/remove, take the cached archetype edge
+                    changed = pending[0]
+                    removed = isinstance(changed, type)
+                    changed_type = changed if removed else changed.__class__
+                    edges = old_archetype.edges_remove if removed else old_archetype.edges_add
+                    new_archetype = edges.get(changed_type)
+                    if new_archetype is None:
+                        new_archetype = self.__get_archetype__(entity.mask)
+                        edges[changed_type] = new_archetype #cache the transition so the next entity taking it skips the mask hash
+                else:
+                    new_archetype = self.__get_archetype__(entity.mask)
+                staged = {component.__class__ : component for component in pending if not isinstance(component, type)}
+                new_archetype.__insert_row__(entity, old_archetype.__extract_row__(entity.id), staged)
+                entity._archetype = new_archetype
+        return self
 
     def AddEntity(self) -> Entity:
-        entity = Entity(AddComponentEvent=self.SortEntity, RemoveComponentEvent=self.SortEntity)
-        self.__entities__[entity.id] = entity
+        if self._free_slots:
+            slot = self._free_slots.pop()
+        else:
+            slot = len(self._generations)
+            self._generations.append(0)
+            self.__entities__.append(None)
+        entity = Entity(ChangeEvent=self.__mark_dirty__,
+                        id=(slot << 32) | self._generations[slot]) #packed (slot, generation) pair, still one hashable int
+        entity._archetype = self._empty_archetype
+        with __STRUCTURE_LOCK__:
+            self._empty_archetype.__insert_row__(entity, {})
+        self.__entities__[slot] = entity
         return entity
+
+    def RemoveEntity(self, entity : Entity) -> None:
+        """Removes the entity from its archetype and recycles its slot; the generation bump makes stale ids detectable instead of aliasing the next occupant"""
+        if entity._dirty: entity._pending = [] #whatever was staged no longer matters
+        with __STRUCTURE_LOCK__: #row extraction resizes columns a SystemThread may be iterating
+            entity._archetype.__extract_row__(entity.id)
+        entity._archetype = None
+        slot = entity.id >> 32
+        self._generations[slot] += 1
+        self.__entities__[slot] = None
+        self._free_slots.append(slot)
+
+    def GetEntity(self, entity_id : int) -> Entity:
+        """Looks an entity up by id, returning **None** if it no longer exists (or the id is from a previous generation of its slot)"""
+        slot = entity_id >> 32
+        if slot < len(self._generations) and self._generations[slot] == (entity_id & 0xFFFFFFFF):
+            return self.__entities__[slot]
+        return None
 ###################################
 
 ##############Pygame + System integration###################
@@ -300,18 +689,31 @@ class Game(SystemManager):
         self.screen = None
         self.clock = None
         self.title = title
+        self.AllowedEvents = [pygame.QUIT]
+        """Event types let into the queue - everything else is dropped at the C layer instead of allocating event objects every frame. </br> Append a type (before <a>Game.Run</a>) only if a system actually drains it with **pygame.event.get(type)** - allowed-but-unread events pile up until the queue caps out and starts dropping everything, QUIT included"""
+
+    def BatchBlit(self, pairs) -> None:
+        """
+        Blits a whole sequence of **(surface, position)** pairs in a single call </br>
+        - Dispatches to C once for the batch instead of paying a Python->C transition per blit
+        """
+        self.screen.blits(pairs, doreturn=False)
 
     def Run(self) -> None:
         """Creates a window and starts up the game (systems are started)"""
         self.screen = pygame.display.set_mode(self.WINDOW_SIZE, pygame.DOUBLEBUF | pygame.HWSURFACE)
         self.controllers = [pygame.joystick.Joystick(i) for i in range(pygame.joystick.get_count())]
         pygame.display.set_caption(self.title)
+        for path,surface in __IMAGE_CACHE__.items(): #images loaded before the window existed couldn't be converted yet
+            __IMAGE_CACHE__[path] = surface.convert_alpha()
+        self.__precompile_systems__()
+        pygame.event.set_blocked(None) #block everything, then re-allow only what is actually consumed
+        pygame.event.set_allowed(self.AllowedEvents)
         carryOn = True
         self.clock = pygame.time.Clock()
         while carryOn:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    carryOn = False
+            for event in pygame.event.get(pygame.QUIT): #only fetch what this loop handles, other allowed types stay queued for the systems
+                carryOn = False
             self.screen.fill(Color.BLACK)
             self.__tick_systems__()
             pygame.display.flip()
@@ -320,10 +722,21 @@ class Game(SystemManager):
 ############################################################
 
 ############# utils ###############
-@lru_cache(maxsize=100)
+__IMAGE_CACHE__ : dict[str, pygame.Surface] = {}
+
 def LoadImage(path : str):
-    """loads an image in pygame format. caches image if it is already loaded once"""
-    return pygame.image.load(path)
+    """
+loads an image in pygame format. caches image if it is already loaded once </br>
+- The cache is unbounded on purpose, evicting would mean re-reading from disk in the middle of a frame </br>
+- Once a window exists the surface is converted to the display format, so later blits are straight copies instead of per-blit conversions
+"""
+    surface = __IMAGE_CACHE__.get(path)
+    if surface is None:
+        surface = pygame.image.load(path)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        __IMAGE_CACHE__[path] = surface
+    return surface
 
 class Color():
     """- Contains constants of colors in tuple form **(r,g,b)**"""